@@ -1,10 +1,24 @@
-from .client import get_tfl_client
+from .analysis import RouteAnalysis
+from .blobs import BlobTable
+from .changelog import ChangeLog
+from .client import (
+    get_async_tfl_client,
+    get_shared_async_tfl_client,
+    get_shared_tfl_client,
+    get_tfl_client,
+    shared_async_tfl_client,
+)
 from .config import get_settings
 from .models.line import Line, LineList
 from .models.route import Route, Routelist, RouteSequence
 from .models.shared import Direction, ModeName, ServiceType
 from .models.stoppoint import StopPoint, StopPointList
-from .stores import LineStore, StopPointStore
+from .stores import (
+    AsyncLineStore,
+    AsyncStopPointStore,
+    LineStore,
+    StopPointStore,
+)
 
 __version__ = "0.1.3"
 __author__ = "Bryan Reedy"
@@ -0,0 +1,137 @@
+"""Vectorised Route Analysis."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+class RouteAnalysis:
+    """Route overlap and corridor analysis across a collection of Lines.
+
+    The `ordered_line_routes` of every route section are compiled once into
+    a sparse line × stop incidence (in coordinate form) and a table of the
+    consecutive-stop segments served by each line. Every query is then a
+    single vectorised pass over those tables rather than a loop over pairs
+    of lines.
+
+    Attributes
+    ----------
+    lines : pd.Index
+        The ids of all analysed lines; the position of an id is its row and
+        column in the square line × line results.
+
+    stops : pd.DataFrame
+        Unique (`line_id`, `stop_id`) incidence pairs.
+
+    segments : pd.DataFrame
+        Unique (`line_id`, `from_id`, `to_id`) consecutive-stop segments.
+    """
+
+    def __init__(self, lines: Iterable[dict]) -> None:
+        lines = list(lines)
+        self.lines = pd.Index([line["id"] for line in lines], name="line_id")
+
+        # One row per ordered stop sequence, exploded to one row per stop
+        sequences = pd.DataFrame(
+            [
+                (line["id"], sequence)
+                for line in lines
+                for section in line["route_sections"]
+                for sequence in section["ordered_line_routes"]
+            ],
+            columns=["line_id", "stop_id"],
+        )
+        sequences["sequence"] = sequences.index
+        visits = sequences.explode("stop_id", ignore_index=True).dropna(
+            subset=["stop_id"],
+        )
+        visits["line_id"] = pd.Categorical(visits["line_id"], categories=self.lines)
+
+        self.stops = visits[["line_id", "stop_id"]].drop_duplicates(
+            ignore_index=True,
+        )
+
+        # Pair each stop with its successor within the same sequence
+        sequence = visits["sequence"].to_numpy()
+        consecutive = sequence[1:] == sequence[:-1]
+        self.segments = pd.DataFrame(
+            {
+                "line_id": visits["line_id"].array[:-1][consecutive],
+                "from_id": visits["stop_id"].to_numpy()[:-1][consecutive],
+                "to_id": visits["stop_id"].to_numpy()[1:][consecutive],
+            },
+        ).drop_duplicates(ignore_index=True)
+
+    # Pairwise
+    def _pairwise(self, table: pd.DataFrame, on: list[str]) -> np.ndarray:
+        """Count the keys shared by every pair of lines in a single self-join."""
+        size = len(self.lines)
+        keyed = table[on].assign(line=table["line_id"].cat.codes.to_numpy())
+        pairs = keyed.merge(keyed, on=on, suffixes=("_a", "_b"))
+        flat = pairs["line_a"].to_numpy(np.int64) * size + pairs["line_b"].to_numpy(
+            np.int64,
+        )
+        return np.bincount(flat, minlength=size * size).reshape(size, size)
+
+    def _frame(self, values: np.ndarray) -> pd.DataFrame:
+        """Wrap a square line × line array as a labelled DataFrame."""
+        return pd.DataFrame(values, index=self.lines, columns=self.lines.copy())
+
+    def shared_stops(self) -> pd.DataFrame:
+        """Return the number of stops shared by each pair of lines.
+
+        The diagonal holds the number of distinct stops served by each line.
+        """
+        return self._frame(self._pairwise(self.stops, ["stop_id"]))
+
+    def shared_segments(self) -> pd.DataFrame:
+        """Return the number of consecutive-stop segments shared by each pair of lines.
+
+        The diagonal holds the number of distinct segments served by each line.
+        """
+        return self._frame(self._pairwise(self.segments, ["from_id", "to_id"]))
+
+    def similarity(
+        self,
+        by: Literal["stops", "segments"] = "stops",
+    ) -> pd.DataFrame:
+        """Return the Jaccard similarity of each pair of lines.
+
+        Parameters
+        ----------
+        by : "stops" | "segments"
+            Compare lines by the sets of stops or of segments they serve.
+        """
+        if by == "stops":
+            shared = self._pairwise(self.stops, ["stop_id"])
+        elif by == "segments":
+            shared = self._pairwise(self.segments, ["from_id", "to_id"])
+        else:
+            msg = f"Unknown similarity basis {by!r}, expected 'stops' or 'segments'."
+            raise ValueError(msg)
+
+        size = np.diag(shared)
+        union = size[:, None] + size[None, :] - shared
+        with np.errstate(divide="ignore", invalid="ignore"):
+            jaccard = np.where(union > 0, shared / union, 0.0)
+
+        return self._frame(jaccard)
+
+    # Corridors
+    def corridor_frequency(self) -> pd.Series:
+        """Return the number of lines serving each (`from_id`, `to_id`) stop pair.
+
+        Sorted with the busiest corridors first.
+        """
+        return (
+            self.segments.groupby(["from_id", "to_id"], sort=False)
+            .size()
+            .rename("lines")
+            .sort_values(ascending=False, kind="stable")
+        )
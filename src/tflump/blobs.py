@@ -0,0 +1,45 @@
+"""Content Addressed Blob Table."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+
+class BlobTable:
+    """A table of shared values keyed by a hash of their content.
+
+    Identical values interned from different records are stored once and
+    referenced by key. Values returned from the table are shared between
+    every record referencing them and should be treated as read-only.
+    """
+
+    def __init__(self, data: dict[str, Any] | None = None) -> None:
+        self.data = {} if data is None else data
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @staticmethod
+    def key(value: Any) -> str:  # noqa: ANN401
+        """Return the content hash of a JSON serialisable value."""
+        encoded = json.dumps(value, separators=(",", ":")).encode()
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+    def intern(self, value: Any) -> str:  # noqa: ANN401
+        """Add a value to the table if not already present and return its key."""
+        key = self.key(value)
+        self.data.setdefault(key, value)
+        return key
+
+    def get(self, key: str) -> Any:  # noqa: ANN401
+        """Return the value stored for a key."""
+        return self.data[key]
+
+    def prune(self, keys: set[str]) -> None:
+        """Drop all values not referenced by the passed keys."""
+        self.data = {key: value for key, value in self.data.items() if key in keys}
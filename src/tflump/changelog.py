@@ -0,0 +1,170 @@
+"""Store Change Log."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import timezone
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from datetime import datetime
+
+
+class ChangeLog:
+    """Delta encoded history of the records of a store, keyed by crawl timestamp.
+
+    Each crawl that changed the store keeps only the prior state of the records
+    it added, removed or modified (None for records it added). The state of a
+    record at any snapshot is therefore the prior state kept by the first later
+    crawl to change it, or its current state if no crawl has changed it since.
+    Unchanged records are never copied.
+
+    Attributes
+    ----------
+    crawls : list[datetime]
+        Timestamps of the crawls that changed the store, oldest first.
+
+    deltas : list[dict[str, dict | None]]
+        Prior states of the records changed by each crawl.
+
+    index : dict[str, list[int]]
+        The crawls that changed each record.
+    """
+
+    def __init__(
+        self,
+        crawls: list[datetime] | None = None,
+        deltas: list[dict[str, dict | None]] | None = None,
+    ) -> None:
+        self.crawls = [] if crawls is None else crawls
+        self.deltas = [] if deltas is None else deltas
+
+        self.index = {}
+        for crawl, delta in enumerate(self.deltas):
+            for key in delta:
+                self.index.setdefault(key, []).append(crawl)
+
+    def __len__(self) -> int:
+        return len(self.crawls)
+
+    # Recording
+    def record(self, timestamp: datetime, before: dict, after: dict) -> bool:
+        """Record the changes between two states of the store data.
+
+        Returns True if the crawl changed any records.
+        """
+        delta = {
+            key: record
+            for key, record in before.items()
+            if after.get(key) is not record and after.get(key) != record
+        }
+        delta.update(dict.fromkeys(after.keys() - before.keys()))
+
+        if not delta:
+            return False
+
+        crawl = len(self.crawls)
+        self.crawls.append(timestamp)
+        self.deltas.append(delta)
+        for key in delta:
+            self.index.setdefault(key, []).append(crawl)
+
+        return True
+
+    def records(self) -> Iterator[dict]:
+        """Yield every prior record state kept in the log."""
+        for delta in self.deltas:
+            yield from (record for record in delta.values() if record is not None)
+
+    # Snapshots
+    def snapshot(self, timestamp: datetime | None = None) -> int:
+        """Return the crawl of the snapshot current at a timestamp.
+
+        -1 refers to the state before the first crawl, a timestamp of None to
+        the latest crawl. Crawls are timestamped in UTC, naive timestamps are
+        taken to be UTC.
+        """
+        if timestamp is None:
+            return len(self.crawls) - 1
+
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+
+        return bisect_right(self.crawls, timestamp) - 1
+
+    def state(self, key: str, crawl: int, current: dict) -> dict | None:
+        """Return the state of a record at the snapshot of a crawl."""
+        changes = self.index.get(key, [])
+        later = bisect_right(changes, crawl)
+
+        if later < len(changes):
+            return self.deltas[changes[later]][key]
+
+        return current.get(key)
+
+    def diff(
+        self,
+        current: dict,
+        since: datetime | None,
+        until: datetime | None = None,
+    ) -> pd.DataFrame:
+        """Return the records changed between two snapshots.
+
+        Parameters
+        ----------
+        current : dict
+            The current store data.
+
+        since : datetime | None
+            Timestamp of the earlier snapshot, None for the state before the
+            first crawl. Naive timestamps are taken to be UTC.
+
+        until : datetime | None
+            Timestamp of the later snapshot, None for the current state.
+
+        Returns
+        -------
+        pd.DataFrame
+            Indexed by record key with a `change` of "added", "removed" or
+            "modified" and the `before` and `after` record states.
+        """
+        start = -1 if since is None else self.snapshot(since)
+        end = self.snapshot(until)
+
+        rows = {}
+        for delta in self.deltas[start + 1 : end + 1]:
+            for key in delta:
+                if key in rows:
+                    continue
+
+                before = self.state(key, start, current)
+                after = self.state(key, end, current)
+
+                if before is None and after is not None:
+                    rows[key] = ("added", before, after)
+                elif after is None and before is not None:
+                    rows[key] = ("removed", before, after)
+                elif before != after:
+                    rows[key] = ("modified", before, after)
+
+        return pd.DataFrame.from_dict(
+            rows,
+            orient="index",
+            columns=["change", "before", "after"],
+        ).rename_axis("key")
+
+    # Persistence
+    def to_dict(self) -> dict:
+        """Return the log as a plain dict for pickling."""
+        return {"crawls": self.crawls, "deltas": self.deltas}
+
+    @classmethod
+    def from_dict(cls, value: dict | None) -> ChangeLog:
+        """Restore a log from `to_dict`, or an empty log from None."""
+        if value is None:
+            return cls()
+
+        return cls(value["crawls"], value["deltas"])
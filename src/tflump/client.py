@@ -2,15 +2,24 @@
 
 from __future__ import annotations
 
+import asyncio
 import random
+import threading
 import time
 from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from datetime import datetime, timezone
+from functools import cache
+from typing import TYPE_CHECKING
 
 import httpx
 
 from .config import get_settings
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Generator
+
 try:
     from importlib.metadata import version
 except ImportError:
@@ -21,8 +30,8 @@ __version__ = version("tflump")
 settings = get_settings()
 
 
-class RateLimit(httpx.BaseTransport):
-    """Implement naive rate limiting in composed Transport."""
+class Throttle:
+    """Naive sliding window rate limiting shared by the sync and async transports."""
 
     ## backoff
     factor: float = 0.5
@@ -39,12 +48,9 @@ class RateLimit(httpx.BaseTransport):
 
     def __init__(
         self,
-        transport: httpx.BaseTransport,
         max_requests: int,
         request_period: int,
     ) -> None:
-        self.transport = transport
-
         self.max_requests = max_requests
         self.request_period = request_period
         self.__history = deque()
@@ -52,17 +58,19 @@ class RateLimit(httpx.BaseTransport):
         self.__prev = datetime.now(timezone.utc)
         self.__debounce = (request_period / max_requests) * 0.7
 
-        # Initial configuration
+    def _throttle(self) -> Generator[float, None, None]:
+        """Yield the pauses required before the next request may be sent.
 
-    def handle_request(self, request: httpx.Request) -> httpx.Response:
-        """Implement naive rate limiting in composed Transport."""
+        The caller sleeps for each yielded duration, once exhausted the
+        request is admitted and recorded in the history window.
+        """
         timestamp = now = datetime.now(timezone.utc)
         backoff_count: int = 0
 
         # Debounce
         pause = (now - self.__prev).total_seconds()
         if pause < self.__debounce:
-            time.sleep(self.__debounce - pause)
+            yield self.__debounce - pause
 
         self.__prev = timestamp = now = datetime.now(timezone.utc)
 
@@ -88,25 +96,75 @@ class RateLimit(httpx.BaseTransport):
                         (self.factor * self.base**backoff_count) + random.uniform(0, 1)  # noqa: S311
                     )
                     backoff_count += 1
-                    time.sleep(min(remaining, backoff))
+                    yield min(remaining, backoff)
 
                 now = datetime.now(timezone.utc)
 
-        response = self.transport.handle_request(request)
-
         self.__history.append(now)
 
-        return response
 
+class RateLimit(Throttle, httpx.BaseTransport):
+    """Implement naive rate limiting in composed Transport.
 
-def get_tfl_client() -> httpx.Client:
-    """Create client configured for TfL."""
+    Requests are admitted one at a time so that threads sharing the client
+    share a single history window.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport,
+        max_requests: int,
+        request_period: int,
+    ) -> None:
+        super().__init__(max_requests, request_period)
+        self.transport = transport
+        self.__lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Implement naive rate limiting in composed Transport."""
+        with self.__lock:
+            for pause in self._throttle():
+                time.sleep(pause)
+
+        return self.transport.handle_request(request)
+
+
+class AsyncRateLimit(Throttle, httpx.AsyncBaseTransport):
+    """Implement naive rate limiting in composed AsyncTransport.
+
+    Requests are admitted one at a time so that concurrent tasks share a single
+    history window, pauses are awaited rather than blocking the event loop.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        max_requests: int,
+        request_period: int,
+    ) -> None:
+        super().__init__(max_requests, request_period)
+        self.transport = transport
+        self.__lock = asyncio.Lock()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Implement naive rate limiting in composed AsyncTransport."""
+        async with self.__lock:
+            for pause in self._throttle():
+                await asyncio.sleep(pause)
+
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Close the composed transport."""
+        await self.transport.aclose()
+
+
+def _client_options() -> tuple[dict[str, str], int]:
+    """Return the TfL request headers and the permitted requests per period."""
     headers = {
         "user-agent": f"python-lump/{__version__}",
     }
     max_requests = 50
-    request_period = 60
-    retries = 3
 
     app_id = settings.tfl.app_id
     app_key = settings.tfl.app_key
@@ -118,8 +176,46 @@ def get_tfl_client() -> httpx.Client:
         headers["app_key"] = app_key.get_secret_value()
         max_requests = 500
 
+    if not settings.tfl.client.compression:
+        headers["accept-encoding"] = "identity"
+
+    return headers, max_requests
+
+
+def _transport_options() -> dict:
+    """Return the pooling and protocol options for the wrapped transport."""
+    options = settings.tfl.client
+
+    return {
+        "retries": options.retries,
+        "http2": options.http2,
+        "limits": httpx.Limits(
+            max_connections=options.max_connections,
+            max_keepalive_connections=options.max_keepalive_connections,
+            keepalive_expiry=options.keepalive_expiry,
+        ),
+    }
+
+
+def _timeout() -> httpx.Timeout:
+    """Return the per-phase request timeouts."""
+    options = settings.tfl.client
+
+    return httpx.Timeout(
+        connect=options.connect_timeout,
+        read=options.read_timeout,
+        write=options.write_timeout,
+        pool=options.pool_timeout,
+    )
+
+
+def get_tfl_client() -> httpx.Client:
+    """Create client configured for TfL."""
+    headers, max_requests = _client_options()
+    request_period = 60
+
     transport = RateLimit(
-        httpx.HTTPTransport(retries=retries),
+        httpx.HTTPTransport(**_transport_options()),
         max_requests=max_requests,
         request_period=request_period,
     )
@@ -128,10 +224,84 @@ def get_tfl_client() -> httpx.Client:
         headers=headers,
         base_url="https://api.tfl.gov.uk",
         transport=transport,
-        timeout=10.0,
+        timeout=_timeout(),
     )
 
 
+def get_async_tfl_client() -> httpx.AsyncClient:
+    """Create async client configured for TfL."""
+    headers, max_requests = _client_options()
+    request_period = 60
+
+    transport = AsyncRateLimit(
+        httpx.AsyncHTTPTransport(**_transport_options()),
+        max_requests=max_requests,
+        request_period=request_period,
+    )
+
+    return httpx.AsyncClient(
+        headers=headers,
+        base_url="https://api.tfl.gov.uk",
+        transport=transport,
+        timeout=_timeout(),
+    )
+
+
+@cache
+def get_shared_tfl_client() -> httpx.Client:
+    """Access the process wide pooled client shared by all stores.
+
+    Sharing one client also shares its connection pool and rate limit window.
+    The shared client should not be closed by its users.
+    """
+    return get_tfl_client()
+
+
+_shared_async_client: ContextVar[httpx.AsyncClient | None] = ContextVar(
+    "shared_async_tfl_client",
+    default=None,
+)
+
+
+@asynccontextmanager
+async def shared_async_tfl_client() -> AsyncIterator[httpx.AsyncClient]:
+    """Share one pooled async client between all stores loaded within the block.
+
+    Connections are bound to the event loop they were opened on, so rather than
+    being kept per process the client is closed on leaving the block. Nested
+    blocks reuse the client of the outermost block.
+
+    >>> async with shared_async_tfl_client():
+    ...     await AsyncLineStore("bus").load()
+    ...     await AsyncLineStore("tube").load()
+    """
+    client = _shared_async_client.get()
+    if client is not None:
+        yield client
+        return
+
+    async with get_async_tfl_client() as client:
+        token = _shared_async_client.set(client)
+        try:
+            yield client
+        finally:
+            _shared_async_client.reset(token)
+
+
+def get_shared_async_tfl_client() -> httpx.AsyncClient:
+    """Access the pooled async client of the enclosing `shared_async_tfl_client`."""
+    client = _shared_async_client.get()
+
+    if client is None:
+        msg = "No shared async client, use `async with shared_async_tfl_client()`."
+        raise RuntimeError(msg)
+
+    return client
+
+
 ## Usage
 # with get_tfl_client(app_id="app_id", app_key="app_key") as client:
 #     pass
+#
+# async with get_async_tfl_client() as client:
+#     pass
@@ -9,11 +9,51 @@ from pydantic import BaseModel, ConfigDict, SecretStr
 from pydantic_settings import BaseSettings
 
 
+class ClientSettings(BaseModel):
+    """HTTP client settings.
+
+    Attributes
+    ----------
+    http2 : bool
+        Multiplex requests over HTTP/2, requires `httpx[http2]`.
+
+    max_connections : int
+        Maximum number of concurrent connections in the pool.
+
+    max_keepalive_connections : int
+        Maximum number of idle connections kept alive in the pool.
+
+    keepalive_expiry : float
+        Seconds an idle connection is kept alive.
+
+    connect_timeout, read_timeout, write_timeout, pool_timeout : float
+        Seconds allowed for each phase of a request.
+
+    retries : int
+        Retries on connection failure.
+
+    compression : bool
+        Request compressed responses, decompressed transparently by httpx.
+    """
+
+    http2: bool = False
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 10.0
+    read_timeout: float = 10.0
+    write_timeout: float = 10.0
+    pool_timeout: float = 10.0
+    retries: int = 3
+    compression: bool = True
+
+
 class TflSettings(BaseModel):
     """TfL specific settings."""
 
     app_id: str | None = None
     app_key: SecretStr | None = None
+    client: ClientSettings = ClientSettings()
 
 
 class Settings(BaseSettings):
@@ -2,27 +2,81 @@
 
 from __future__ import annotations
 
+import asyncio
+import copy
+import hashlib
 import importlib
 import json
 import pickle
-from functools import lru_cache
+import warnings
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from functools import cache, lru_cache
 from pathlib import Path
-from typing import TYPE_CHECKING, Self, cast
+from typing import TYPE_CHECKING, ClassVar, Self, cast
 
 import httpx
 import pandas as pd
 
-from .client import get_tfl_client
+from .analysis import RouteAnalysis
+from .blobs import BlobTable
+from .changelog import ChangeLog
+from .client import (
+    get_shared_async_tfl_client,
+    get_shared_tfl_client,
+    shared_async_tfl_client,
+)
 from .models.line import Line
 from .models.route import RouteSequence
+from .models.shared import ServiceType
 from .models.stoppoint import StopPoint, StopPointList
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from pydantic import BaseModel
+
     from .models.shared import ModeName
 
+    Migration = Callable[["Store"], set[str]]
+
+
+@cache
+def model_fingerprint(model: type[BaseModel]) -> str:
+    """Return a hash of the JSON schema of a model."""
+    schema = json.dumps(model.model_json_schema(), sort_keys=True)
+    return hashlib.blake2b(schema.encode(), digest_size=16).hexdigest()
+
 
 class Store:
-    """Base Store class."""
+    """Base Store class.
+
+    Store files carry the `schema_version` of the store and a fingerprint of
+    its record `model`. Files saved at an older version are upgraded on load
+    by the registered migrations, one version at a time. A migration upgrades
+    `store.data` in place and returns the keys of any records it cannot
+    derive, these are dropped and held in `unresolved`, which is saved with the
+    store, until refetched. Line migrations see expanded records, with the
+    values of their route section fields shared through `blobs` rather than
+    the blob keys.
+
+    Each crawl that changes the store is recorded in its `changes` log, see
+    `diff` to compare the snapshots at any two crawl timestamps.
+
+    >>> @BaseLineStore.migration(1)
+    ... def prefix_stop_ids(store: BaseLineStore) -> set[str]:
+    ...     for record in store.data.values():
+    ...         for section in record["route_sections"]:
+    ...             section["ordered_line_routes"] = [
+    ...                 [f"490{stop_id}" for stop_id in route]
+    ...                 for route in section["ordered_line_routes"]
+    ...             ]
+    ...     return set()
+    """
+
+    schema_version: ClassVar[int] = 1
+    model: ClassVar[type[BaseModel] | None] = None
+    migrations: ClassVar[dict[int, Migration]] = {}
 
     @lru_cache(maxsize=None)
     def __new__(cls: type[Store], *args, **kwargs) -> Self:
@@ -34,27 +88,178 @@ class Store:
         self.datadir = importlib.resources.files("tflump")
         self.storename = storename
         self.data = {}
+        self.unresolved = set()
+        self.changes = ChangeLog()
+        self._baseline = {}
 
     # Pandas
     def dataframe(self) -> pd.Dataframe:
         """Return the store values as a Pandas DataFrame."""
-        return pd.json_normalize(list(self.data.values()))
+        return pd.json_normalize(self.records())
+
+    # Access
+    def records(self) -> list[dict]:
+        """Return the store values with any shared content expanded."""
+        return [self._expand(record) for record in self.data.values()]
+
+    def _expand(self, record: dict) -> dict:
+        """Expand a stored record for reading."""
+        return record
+
+    # Changes
+    def diff(
+        self,
+        since: datetime | None,
+        until: datetime | None = None,
+    ) -> pd.DataFrame:
+        """Return the records added, removed or modified between two snapshots.
+
+        Snapshots are those current at the passed timestamps, see `ChangeLog.diff`.
+        """
+        changes = self.changes.diff(self.data, since, until)
+
+        for column in ("before", "after"):
+            changes[column] = [
+                None if record is None else self._expand(record)
+                for record in changes[column]
+            ]
+
+        return changes
+
+    def _snapshot(self, timestamp: datetime) -> None:
+        """Record the changes since the previous snapshot in the change log.
+
+        Records held in `unresolved` were dropped to be refetched rather than
+        removed, their previous state is kept as the baseline until refetched.
+        """
+        held = {
+            key: record
+            for key, record in self._baseline.items()
+            if key in self.unresolved and key not in self.data
+        }
+        current = {**held, **self.data}
+
+        self.changes.record(timestamp, self._baseline, current)
+        self._baseline = current
+
+    def _crawled(self) -> None:
+        """Run after each fetch, before the store is saved."""
 
     # Lifecycle
-    def load(self) -> None:
-        """Load the store data from file if exists otherwise query TfL."""
-        datafile = self.datadir / (self.storename + ".pkl")
+    def load(self, **options) -> None:
+        """Load the store data from file if exists otherwise query TfL.
 
-        if datafile.is_file():
-            with datafile.open("rb") as datafile:
-                self.data = pickle.load(datafile)
+        Any keyword arguments are passed to the `_fetch` of the store subclass.
+        """
+        self._read()
 
         try:
-            self._fetch()
+            self._fetch(**options)
         finally:
+            self._crawled()
             self.save()
 
-    def _fetch(self) -> dict:
+    def _read(self) -> None:
+        """Read the store data from file if it exists, migrating older schemas."""
+        datafile = self.datadir / (self.storename + ".pkl")
+
+        if datafile.is_file():
+            with datafile.open("rb") as datafile:
+                contents = pickle.load(datafile)
+
+            # Files saved before schema versioning hold the bare payload
+            if isinstance(contents, dict) and contents.keys() >= {
+                "schema",
+                "fingerprint",
+                "payload",
+            }:
+                version = contents["schema"]
+                fingerprint = contents["fingerprint"]
+                self.changes = ChangeLog.from_dict(contents.get("changes"))
+                self.unresolved = set(contents.get("unresolved", ()))
+                contents = contents["payload"]
+            else:
+                version = 0
+                fingerprint = None
+
+            if version > self.schema_version:
+                msg = (
+                    f"Store file {self.storename!r} has schema {version}, newer than "
+                    f"the supported schema {self.schema_version}."
+                )
+                raise ValueError(msg)
+
+            self._restore(contents)
+            saved = dict(self.data)
+            self._migrate(version, fingerprint)
+
+            # Records dropped by the migration are compared against their saved
+            # state once refetched, upgraded records against their new schema
+            self._baseline = {
+                **{key: saved[key] for key in self.unresolved if key in saved},
+                **self.data,
+            }
+
+    def _migrate(self, version: int, fingerprint: str | None) -> None:
+        """Apply the registered migrations from `version` to the current schema."""
+        for step in range(version, self.schema_version):
+            migration = self._migration(step)
+
+            if migration is None:
+                warnings.warn(
+                    f"No migration from schema {step} for {self.storename!r}, "
+                    "all records will be refetched.",
+                    stacklevel=3,
+                )
+                self.unresolved.update(self.data)
+                self.data = {}
+                return
+
+            unresolved = migration(self)
+            for key in unresolved:
+                self.data.pop(key, None)
+            self.unresolved.update(unresolved)
+
+        if version == self.schema_version and fingerprint != self.fingerprint():
+            warnings.warn(
+                f"The {self.model.__name__} model has changed since {self.storename!r} "
+                f"was saved at schema {version}, bump `schema_version` and register "
+                "a migration.",
+                stacklevel=3,
+            )
+
+    @classmethod
+    def _migration(cls, version: int) -> Migration | None:
+        """Return the most specific migration registered from `version`."""
+        for klass in cls.__mro__:
+            migration = vars(klass).get("migrations", {}).get(version)
+            if migration is not None:
+                return migration
+
+        return None
+
+    @classmethod
+    def migration(cls, version: int) -> Callable[[Migration], Migration]:
+        """Register a migration of records saved at `version` to `version + 1`.
+
+        Migrations are registered on the nearest class declaring `migrations`,
+        so those of `LineStore` and `AsyncLineStore` are shared through
+        `BaseLineStore`.
+        """
+
+        def register(migration: Migration) -> Migration:
+            owner = next(klass for klass in cls.__mro__ if "migrations" in vars(klass))
+            owner.migrations[version] = migration
+            return migration
+
+        return register
+
+    @classmethod
+    def fingerprint(cls) -> str | None:
+        """Return the fingerprint of the store record model."""
+        return None if cls.model is None else model_fingerprint(cls.model)
+
+    def _fetch(self, **options) -> dict:
         """Fetch store data."""
 
     def save(self, filename: str | None = None) -> None:
@@ -65,25 +270,80 @@ class Store:
             filepath = self.datadir / (filename + ".pkl")
 
         with filepath.open("wb") as lib_file:
-            pickle.dump(self.data, lib_file)
+            pickle.dump(
+                {
+                    "schema": self.schema_version,
+                    "fingerprint": self.fingerprint(),
+                    "payload": self._dump(),
+                    "changes": self.changes.to_dict(),
+                    "unresolved": sorted(self.unresolved),
+                },
+                lib_file,
+            )
             lib_file.close()
 
+    def _dump(self) -> object:
+        """Return the object to be pickled."""
+        return self.data
+
+    def _restore(self, payload: object) -> None:
+        """Restore the store data from an unpickled object."""
+        self.data = payload
+
     # Output
     def write_json(self, filepath: str | None = None) -> json:
         """Write the store data to a JSON file."""
         if filepath is None:
             filepath = self.datadir / (self.storename + ".json")
             with filepath.open("w") as json_file:
-                data_values = list(self.data.values())
+                data_values = self.records()
                 json.dump(data_values, json_file, indent=4, default=str)
         else:
             with Path(filepath).open("w") as json_file:
-                data_values = list(self.data.values())
+                data_values = self.records()
                 json.dump(data_values, json_file, indent=4, default=str)
 
 
+class AsyncStore(Store):
+    """Base Store class for use under asyncio.
+
+    File I/O is run in a worker thread so as not to block the event loop, the
+    store should not be modified while a save is pending.
+    """
+
+    # Lifecycle
+    async def load(self, **options) -> None:
+        """Load the store data from file if exists otherwise query TfL."""
+        await asyncio.to_thread(self._read)
+
+        try:
+            await self._fetch(**options)
+        finally:
+            self._crawled()
+            await self.save()
+
+    async def _fetch(self, **options) -> dict:
+        """Fetch store data."""
+
+    async def save(self, filename: str | None = None) -> None:
+        """Save the store data object using pickle."""
+        await asyncio.to_thread(super().save, filename)
+
+    # Output
+    async def write_json(self, filepath: str | None = None) -> json:
+        """Write the store data to a JSON file."""
+        await asyncio.to_thread(super().write_json, filepath)
+
+
 class StopPointStore(Store):
-    """A store of StopPoint instances keyed by NaPTAN ID."""
+    """A store of StopPoint instances keyed by NaPTAN ID.
+
+    StopPoints a migration cannot derive are refetched by the LineStores that
+    serve them, see `BaseLineStore._read`.
+    """
+
+    model = StopPoint
+    migrations = {}
 
     def __init__(self, storename: str = "data/stoppoints") -> None:
         super().__init__(storename)
@@ -91,7 +351,7 @@ class StopPointStore(Store):
     # Pandas
     def dataframe(self) -> pd.Dataframe:
         """Return the store values as a Pandas DataFrame."""
-        return pd.json_normalize(list(self.data.values()))
+        return pd.json_normalize(self.records())
 
     # Access
     def has_stop_point(self, naptan_id: str) -> bool:
@@ -106,37 +366,95 @@ class StopPointStore(Store):
         """Return a list of StopPoints for passed NaPTAN IDs, missing ids will be replaced with None."""
         return [self.data.get(naptan_id, None) for naptan_id in naptan_ids]
 
-    def add_stop_points(self, stoppoints: list[StopPoint]) -> None:
-        """Add StopPoints to the store."""
+    def add_stop_points(
+        self,
+        stoppoints: list[StopPoint],
+        replace: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
+        """Add StopPoints to the store, replacing changed StopPoints if `replace`."""
+        if self._add(stoppoints, replace):
+            self.save()
+
+    def _add(self, stoppoints: list[StopPoint], replace: bool = False) -> bool:  # noqa: FBT001, FBT002
+        """Add StopPoints to the store data, returning True if any were new."""
         dirty = False
         for stoppoint in stoppoints:
-            if stoppoint["id"] not in self.data:
+            if stoppoint["id"] not in self.data or (
+                replace and self.data[stoppoint["id"]] != stoppoint
+            ):
                 self.data[stoppoint["id"]] = stoppoint
+                self.unresolved.discard(stoppoint["id"])
                 dirty = True
 
-        if dirty:
-            self.save()
+        return dirty
+
+
+class AsyncStopPointStore(StopPointStore, AsyncStore):
+    """A store of StopPoint instances keyed by NaPTAN ID for use under asyncio."""
+
+    async def add_stop_points(
+        self,
+        stoppoints: list[StopPoint],
+        replace: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
+        """Add StopPoints to the store, replacing changed StopPoints if `replace`."""
+        if self._add(stoppoints, replace):
+            await self.save()
+
+
+class BaseLineStore(Store):
+    """Base class for stores of Lines for a given Mode, keyed by Line ID.
+
+    Route geometry and stop sequences are frequently repeated across
+    directions, service types and branches. Each is stored once in a content
+    addressed `BlobTable` and referenced by key from the route sections,
+    being expanded again when read through `get_line` or `dataframe`.
+
+    Loading can be narrowed to selected lines or service types, only the
+    matching route sequences are then fetched and only their stops added to
+    the StopPointStore. The service types loaded for each line are recorded,
+    a later load requesting service types a line was not loaded with fetches
+    it again, keeping its stored route sections of other service types. A
+    narrowed load can be kept in its own store file with `storename`.
+
+    >>> store = LineStore("bus", storename="data/lines-superloop")
+    >>> store.load(match="SL")
+
+    Lines already in the store are only fetched again when loading with
+    `refresh=True`. Each load records the changes to both the lines and the
+    StopPointStore under one crawl timestamp, compare any two snapshots with
+    `diff` and `route_diff`.
+
+    >>> store.load(refresh=True)
+    >>> store.route_diff(since=last_week)
+    """
+
+    _route_key = ("direction", "service_type", "originator", "destination")
 
+    model = Line
+    migrations = {}
 
-class LineStore(Store):
-    """A store of Lines for a given Mode, keyed by Line ID."""
+    _shared_fields = ("line_strings", "ordered_line_routes")
+    _service_types = (ServiceType.REGULAR, ServiceType.NIGHT)
+    _line_id_batch = 20
 
     def __init__(
         self,
         mode: ModeName,
+        stoppoint_store: StopPointStore,
+        storename: str | None = None,
     ) -> None:
-        super().__init__(f"data/lines-{mode}")
+        super().__init__(f"data/lines-{mode}" if storename is None else storename)
 
         self.mode = mode
-        self.client = get_tfl_client()
-        self.__stoppoint_store = StopPointStore()
-
-        self.__stoppoint_store.load()
+        self.blobs = BlobTable()
+        self.loaded_service_types = {}
+        self.__stoppoint_store = stoppoint_store
 
     # Pandas
     def dataframe(self) -> pd.Dataframe:
         """Return the store values as a Pandas DataFrame."""
-        return pd.json_normalize(list(self.data.values()))
+        return pd.json_normalize(self.records())
 
     # Access
     def stoppoint_store(self) -> StopPointStore:
@@ -147,15 +465,435 @@ class LineStore(Store):
         return line_id in self.data
 
     def get_line(self, line_id: str) -> Line:
-        """Return StopPoint for passed NaPTAN ID if it exists, otherwise None."""
-        return self.data.get(line_id, None)
+        """Return Line for passed Line ID if it exists, otherwise None."""
+        line = self.data.get(line_id, None)
+        return None if line is None else self._expand(line)
 
     def get_lines(self, line_ids: list[str]) -> list[Line]:
         """Return a list of Lines, missing ids will be replaced with None."""
-        return [self.data.get(line_id, None) for line_id in line_ids]
+        return [self.get_line(line_id) for line_id in line_ids]
+
+    def _compact(self, line: Line) -> dict:
+        """Replace shared route section fields with their blob keys."""
+        return {
+            **line,
+            "route_sections": [
+                {
+                    **section,
+                    **{
+                        field: [self.blobs.intern(value) for value in section[field]]
+                        for field in self._shared_fields
+                    },
+                }
+                for section in line["route_sections"]
+            ],
+        }
+
+    def _expand(self, record: dict) -> Line:
+        """Replace route section blob keys with their shared values."""
+        return {
+            **record,
+            "route_sections": [
+                {
+                    **section,
+                    **{
+                        field: [self.blobs.get(key) for key in section[field]]
+                        for field in self._shared_fields
+                    },
+                }
+                for section in record["route_sections"]
+            ],
+        }
+
+    # Analysis
+    def analysis(self) -> RouteAnalysis:
+        """Return a RouteAnalysis of the lines in the store."""
+        return RouteAnalysis(self.records())
+
+    # Changes
+    def route_diff(
+        self,
+        since: datetime | None,
+        until: datetime | None = None,
+    ) -> pd.DataFrame:
+        """Return the route sections added, removed or modified between two snapshots.
+
+        Only the lines changed between the snapshots are compared. Route sections
+        are indexed by `line_id` and their `direction`, `service_type`,
+        `originator` and `destination`.
+        """
+        rows = {}
+        for line_id, before, after in (
+            self.changes.diff(self.data, since, until)[["before", "after"]]
+            .itertuples()
+        ):
+            sections_before = self._route_sections(before)
+            sections_after = self._route_sections(after)
+
+            for key in sections_before.keys() | sections_after.keys():
+                section_before = sections_before.get(key)
+                section_after = sections_after.get(key)
+
+                if section_before is None:
+                    change = "added"
+                elif section_after is None:
+                    change = "removed"
+                elif section_before != section_after:
+                    change = "modified"
+                else:
+                    continue
+
+                rows[(line_id, *key)] = (
+                    change,
+                    self._expand_section(section_before),
+                    self._expand_section(section_after),
+                )
+
+        return pd.DataFrame(
+            list(rows.values()),
+            index=pd.MultiIndex.from_tuples(
+                list(rows),
+                names=["line_id", *self._route_key],
+            ),
+            columns=["change", "before", "after"],
+        )
+
+    def _route_sections(self, record: dict | None) -> dict[tuple, dict]:
+        """Return the route sections of a stored record keyed by route."""
+        if record is None:
+            return {}
+
+        return {
+            tuple(section[field] for field in self._route_key): section
+            for section in record["route_sections"]
+        }
+
+    def _expand_section(self, section: dict | None) -> dict | None:
+        """Replace the blob keys of a single route section."""
+        if section is None:
+            return None
+
+        return self._expand({"route_sections": [section]})["route_sections"][0]
+
+    def _crawled(self) -> None:
+        """Snapshot the lines and StopPoints changed by the crawl."""
+        timestamp = datetime.now(timezone.utc)
+
+        self._snapshot(timestamp)
+        self.stoppoint_store()._snapshot(timestamp)
 
     # Lifecycle
-    def _fetch(self) -> dict:
+    def _dump(self) -> object:
+        """Return the store data along with the blobs it or its history reference."""
+        self.blobs.prune(
+            {
+                key
+                for records in (
+                    self.data.values(),
+                    self._baseline.values(),
+                    self.changes.records(),
+                )
+                for record in records
+                for section in record["route_sections"]
+                for field in self._shared_fields
+                for key in section[field]
+            },
+        )
+        return {
+            "data": self.data,
+            "blobs": self.blobs.data,
+            "service_types": {
+                line_id: service_types
+                for line_id, service_types in self.loaded_service_types.items()
+                if line_id in self.data
+            },
+        }
+
+    def _restore(self, payload: object) -> None:
+        """Restore the store data and blobs, compacting files saved without blobs.
+
+        Lines saved without their loaded service types were loaded with all of
+        the default service types.
+        """
+        if isinstance(payload, dict) and payload.keys() >= {"data", "blobs"}:
+            self.data = payload["data"]
+            self.blobs = BlobTable(payload["blobs"])
+            loaded_service_types = payload.get("service_types", {})
+        else:
+            self.blobs = BlobTable()
+            self.data = {
+                line_id: self._compact(line) for line_id, line in payload.items()
+            }
+            loaded_service_types = {}
+
+        self.loaded_service_types = {
+            line_id: loaded_service_types.get(
+                line_id,
+                self._resolve_service_types(None),
+            )
+            for line_id in self.data
+        }
+
+    def _migrate(self, version: int, fingerprint: str | None) -> None:
+        """Apply the registered migrations to expanded lines, compacting them after.
+
+        The expanded lines are copied so that no migration can modify the
+        values shared through `blobs`.
+        """
+        if version == self.schema_version:
+            super()._migrate(version, fingerprint)
+            return
+
+        self.data = {
+            line_id: copy.deepcopy(self._expand(record))
+            for line_id, record in self.data.items()
+        }
+        try:
+            super()._migrate(version, fingerprint)
+        finally:
+            self.data = {
+                line_id: self._compact(line) for line_id, line in self.data.items()
+            }
+
+    def _read(self) -> None:
+        """Read the store data, dropping lines that serve unresolved StopPoints.
+
+        StopPoints are only fetched along with the sequences of their lines,
+        so any line with a stop dropped by a StopPointStore migration is
+        dropped here and held in `unresolved` to be refetched.
+        """
+        super()._read()
+
+        unresolved = self.stoppoint_store().unresolved
+        if not unresolved:
+            return
+
+        # Check each shared stop sequence once
+        keys = {
+            key
+            for key, value in self.blobs.data.items()
+            if isinstance(value, list) and not unresolved.isdisjoint(value)
+        }
+        for line_id in [
+            line_id
+            for line_id, record in self.data.items()
+            if any(
+                key in keys
+                for section in record["route_sections"]
+                for key in section["ordered_line_routes"]
+            )
+        ]:
+            del self.data[line_id]
+            self.unresolved.add(line_id)
+
+    def _lines_endpoints(
+        self,
+        line_ids: list[str] | None = None,
+        service_types: list[ServiceType] | None = None,
+    ) -> list[str]:
+        """Return the endpoints listing lines and their route sections.
+
+        All lines of the mode are listed unless `line_ids` are passed, in which
+        case they are batched, along with any `unresolved` lines, into multi-id
+        `/Line/{ids}/Route` lookups.
+        """
+        query = "serviceTypes=" + ",".join(service_types or self._service_types)
+
+        if line_ids is None:
+            return [f"/Line/Mode/{self.mode}/Route?{query}"]
+
+        line_ids = list(dict.fromkeys([*line_ids, *sorted(self.unresolved)]))
+
+        return [
+            f"/Line/{','.join(line_ids[i : i + self._line_id_batch])}/Route?{query}"
+            for i in range(0, len(line_ids), self._line_id_batch)
+        ]
+
+    @staticmethod
+    def _sequence_endpoint(line_dict: dict, section: dict) -> str:
+        """Return the route sequence endpoint for a route section.
+
+        Sequences are requested for the service type of the section, TfL
+        otherwise returns the Regular sequence.
+        """
+        return (
+            f"/Line/{line_dict['id']}/Route/Sequence/{section['direction']}"
+            f"?serviceTypes={section['serviceType']}"
+        )
+
+    def _select(
+        self,
+        line_list: list[dict],
+        match: str | Callable[[str], bool] | None = None,
+        service_types: list[ServiceType] | None = None,
+        refresh: bool = False,  # noqa: FBT001, FBT002
+    ) -> Iterator[dict]:
+        """Yield the listed lines that match the selection.
+
+        Parameters
+        ----------
+        line_list : list[dict]
+            Lines as returned by the `/Line/.../Route` endpoints.
+
+        match : str | Callable[[str], bool] | None
+            A case-insensitive prefix of, or predicate on, the line name.
+            Lines held in `unresolved` are yielded regardless.
+
+        service_types : list[ServiceType] | None
+            Route sections of other service types are dropped, lines left
+            without any route sections are skipped.
+
+        refresh : bool
+            Also yield lines already loaded with all of the service types.
+        """
+        if isinstance(match, str):
+            prefix = match.casefold()
+
+            def match(name: str) -> bool:
+                return name.casefold().startswith(prefix)
+
+        service_types = self._resolve_service_types(service_types)
+
+        for line_dict in line_list:
+            if line_dict["modeName"] != self.mode:
+                continue
+
+            if (
+                line_dict["id"] in self.data
+                and not refresh
+                and set(service_types)
+                <= set(self.loaded_service_types.get(line_dict["id"], ()))
+            ):
+                continue
+
+            if (
+                match is not None
+                and not match(line_dict["name"])
+                and line_dict["id"] not in self.unresolved
+            ):
+                continue
+
+            sections = [
+                section
+                for section in line_dict["routeSections"]
+                if section["serviceType"] in service_types
+            ]
+
+            if sections:
+                yield {**line_dict, "routeSections": sections}
+
+    @staticmethod
+    def _report(exc: httpx.HTTPError) -> None:
+        """Print the reason a request to TfL failed."""
+        if isinstance(exc, httpx.HTTPStatusError):
+            print(  # noqa: T201
+                f"Error response {exc.response.status_code} "
+                f"while requesting {exc.request.url!r}.",
+            )
+        else:
+            print(f"An error occurred while requesting {exc.request.url!r}.")  # noqa: T201
+
+    @staticmethod
+    def _merge_sequence(section: dict, seq_dict: dict) -> list[StopPoint]:
+        """Merge sequence attributes into `route_section` returning its StopPoints."""
+        stop_points = [
+            stop_point
+            for seq in seq_dict["stopPointSequences"]
+            for stop_point in StopPointList.model_validate(
+                seq["stopPoint"],
+            ).model_dump()
+        ]
+
+        route_sequence = RouteSequence.model_validate(seq_dict)
+
+        section["isOutboundOnly"] = route_sequence.is_outbound_only
+        section["lineStrings"] = route_sequence.line_strings
+        section["orderedLineRoutes"] = route_sequence.ordered_line_routes
+
+        return stop_points
+
+    def _resolve_service_types(
+        self,
+        service_types: list[ServiceType] | None,
+    ) -> list[str]:
+        """Return the requested service type values, the defaults for None."""
+        return [
+            ServiceType(service_type).value
+            for service_type in service_types or self._service_types
+        ]
+
+    def _add_line(
+        self,
+        line_dict: dict,
+        service_types: list[ServiceType] | None = None,
+    ) -> None:
+        """Parse line and index in store.
+
+        Stored route sections of service types other than those fetched are
+        kept, so that a narrowed load never cuts down a stored line.
+        """
+        line = Line.model_validate(line_dict)
+        record = self._compact(line.model_dump())
+        loaded = set(self._resolve_service_types(service_types))
+
+        stored = self.data.get(line.id)
+        if stored is not None:
+            record["route_sections"] += [
+                section
+                for section in stored["route_sections"]
+                if section["service_type"] not in loaded
+            ]
+            record["service_types"] = list(
+                dict.fromkeys([*record["service_types"], *stored["service_types"]]),
+            )
+            loaded.update(self.loaded_service_types.get(line.id, ()))
+
+        self.data[line.id] = record
+        self.loaded_service_types[line.id] = sorted(loaded)
+        self.unresolved.discard(line.id)
+
+    def _remove_unlisted(self, listed: set[str]) -> None:
+        """Remove the lines no longer listed for the mode."""
+        for line_id in self.data.keys() - listed:
+            del self.data[line_id]
+
+        self.unresolved &= listed
+
+
+class LineStore(BaseLineStore):
+    """A store of Lines for a given Mode, keyed by Line ID.
+
+    Requests are made with the process wide client from `get_shared_tfl_client`
+    unless a client is passed.
+    """
+
+    def __init__(
+        self,
+        mode: ModeName,
+        storename: str | None = None,
+        client: httpx.Client | None = None,
+    ) -> None:
+        super().__init__(mode, StopPointStore(), storename)
+
+        self.client = get_shared_tfl_client() if client is None else client
+
+        self.stoppoint_store().load()
+
+    # Lifecycle
+    def load(self, **options) -> None:
+        """Load the Line data then save the StopPointStore with its snapshot."""
+        try:
+            super().load(**options)
+        finally:
+            self.stoppoint_store().save()
+
+    def _fetch(
+        self,
+        line_ids: list[str] | None = None,
+        match: str | Callable[[str], bool] | None = None,
+        service_types: list[ServiceType] | None = None,
+        refresh: bool = False,  # noqa: FBT001, FBT002
+    ) -> dict:
         """Fetch Line and Route data from TfL.
 
         Fetches all lines and their route sections for the mode
@@ -165,48 +903,183 @@ class LineStore(Store):
         On first run this is very slow due to the number of nested
         calls made. However on subsequent loads only lines not already
         in the store will be freshly queried.
+
+        Parameters
+        ----------
+        line_ids : list[str] | None
+            Fetch only these lines, looked up in batches.
+
+        match : str | Callable[[str], bool] | None
+            Fetch only lines whose name starts with the passed prefix or
+            satisfies the passed predicate.
+
+        service_types : list[ServiceType] | None
+            Fetch only route sections of these service types.
+
+        refresh : bool
+            Fetch the selected lines again even if already in the store,
+            replacing any changed Lines and StopPoints. A refresh of the
+            whole mode also removes lines no longer listed by TfL.
         """
-        # Fetch all lines for mode
-        line_list = self.request(
-            f"/Line/Mode/{self.mode}/Route?serviceTypes=Regular,Night",
-        ).json()
+        listed = set()
 
-        for line_dict in line_list:
-            if line_dict["id"] not in self.data:
+        for endpoint in self._lines_endpoints(line_ids, service_types):
+            line_list = self.request(endpoint).json()
+            listed.update(line_dict["id"] for line_dict in line_list)
+
+            for line_dict in self._select(line_list, match, service_types, refresh):
                 ## get sequence for each direction
                 for section in line_dict["routeSections"]:
                     seq_dict = self.request(
-                        f"/Line/{line_dict['id']}/Route/Sequence/{section['direction']}",
+                        self._sequence_endpoint(line_dict, section),
                     ).json()
 
                     # Add StopPoints to store
-                    for seq in seq_dict["stopPointSequences"]:
-                        stop_points = StopPointList.model_validate(seq["stopPoint"])
-                        self.__stoppoint_store.add_stop_points(
-                            stop_points.model_dump(),
-                        )
-
-                    # merge sequence attributes into `route_section`
-                    route_sequence = RouteSequence.model_validate(seq_dict)
+                    self.stoppoint_store().add_stop_points(
+                        self._merge_sequence(section, seq_dict),
+                        replace=refresh,
+                    )
 
-                    section["isOutboundOnly"] = route_sequence.is_outbound_only
-                    section["lineStrings"] = route_sequence.line_strings
-                    section["orderedLineRoutes"] = route_sequence.ordered_line_routes
+                self._add_line(line_dict, service_types)
 
-                # Parse line and index in store
-                line = Line.model_validate(line_dict)
-                self.data[line.id] = line.model_dump()
+        if refresh and line_ids is None and match is None and service_types is None:
+            self._remove_unlisted(listed)
 
     def request(self, endpoint: str) -> httpx.Response:
         """Query TfL endpoint."""
         try:
             response = self.client.get(endpoint)
             return response.raise_for_status()
-        except httpx.RequestError as exc:
-            print(f"An error occurred while requesting {exc.request.url!r}.")
+        except httpx.HTTPError as exc:
+            self._report(exc)
             raise exc from exc
-        except httpx.HTTPStatusError as exc:
-            print(
-                f"Error response {exc.response.status_code} while requesting {exc.request.url!r}.",
+
+
+class AsyncLineStore(BaseLineStore, AsyncStore):
+    """A store of Lines for a given Mode, keyed by Line ID, for use under asyncio.
+
+    All new lines are fetched concurrently, the shared `AsyncRateLimit`
+    transport keeps their requests within the TfL request limits. Requests are
+    made with the client of the enclosing `shared_async_tfl_client` block, or
+    of a block opened for the load, unless a client is passed.
+
+    Usage
+    -----
+    >>> store = AsyncLineStore("bus")
+    >>> await store.load()
+    """
+
+    def __init__(
+        self,
+        mode: ModeName,
+        storename: str | None = None,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        super().__init__(mode, AsyncStopPointStore(), storename)
+
+        self.client = client
+
+    # Lifecycle
+    async def load(self, **options) -> None:
+        """Load the owned StopPointStore then the Line data.
+
+        The StopPointStore is saved once, with its snapshot, after all lines
+        are fetched.
+        """
+        scope = shared_async_tfl_client() if self.client is None else nullcontext()
+
+        async with scope:
+            await self.stoppoint_store().load()
+
+            try:
+                await super().load(**options)
+            finally:
+                await self.stoppoint_store().save()
+
+    async def _fetch(
+        self,
+        line_ids: list[str] | None = None,
+        match: str | Callable[[str], bool] | None = None,
+        service_types: list[ServiceType] | None = None,
+        refresh: bool = False,  # noqa: FBT001, FBT002
+    ) -> dict:
+        """Fetch Line and Route data from TfL.
+
+        As `LineStore._fetch`, lines are added to the store as their sequences
+        complete. A failed request cancels the lines still in flight and, as
+        with `LineStore`, its `httpx.HTTPError` is raised.
+        """
+        listed = set()
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                for endpoint in self._lines_endpoints(line_ids, service_types):
+                    line_list = (await self.request(endpoint)).json()
+                    listed.update(line_dict["id"] for line_dict in line_list)
+
+                    for line_dict in self._select(
+                        line_list,
+                        match,
+                        service_types,
+                        refresh,
+                    ):
+                        group.create_task(
+                            self._fetch_line(line_dict, service_types, refresh),
+                        )
+        except ExceptionGroup as exc:
+            # Surface the first request error rather than the group
+            errors = (
+                error for error in exc.exceptions if isinstance(error, httpx.HTTPError)
             )
+            error = next(errors, None)
+            if error is None:
+                raise
+
+            raise error from exc
+
+        if refresh and line_ids is None and match is None and service_types is None:
+            self._remove_unlisted(listed)
+
+    async def _fetch_line(
+        self,
+        line_dict: dict,
+        service_types: list[ServiceType] | None = None,
+        refresh: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
+        """Fetch the sequence for each direction of a line and add it to the store."""
+        for section in line_dict["routeSections"]:
+            seq_dict = (
+                await self.request(
+                    self._sequence_endpoint(line_dict, section),
+                )
+            ).json()
+
+            # Add StopPoints to store, saved once the fetch completes
+            self.stoppoint_store()._add(
+                self._merge_sequence(section, seq_dict),
+                replace=refresh,
+            )
+
+        self._add_line(line_dict, service_types)
+
+    async def request(self, endpoint: str) -> httpx.Response:
+        """Query TfL endpoint."""
+        try:
+            client = self.client
+            if client is None:
+                client = get_shared_async_tfl_client()
+
+            response = await client.get(endpoint)
+            return response.raise_for_status()
+        except httpx.HTTPError as exc:
+            self._report(exc)
             raise exc from exc
+
+
+@Store.migration(0)
+def unversioned(_store: Store) -> set[str]:
+    """Upgrade files saved before schema versioning.
+
+    Their payload formats are already handled by `Store._restore`.
+    """
+    return set()
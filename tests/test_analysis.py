@@ -0,0 +1,65 @@
+"""RouteAnalysis tests."""
+
+import pytest
+
+from tflump import RouteAnalysis
+
+
+def line_stub(line_id: str, *sequences: list[str]) -> dict:
+    """Minimal Line dict with one route section per sequence."""
+    return {
+        "id": line_id,
+        "name": line_id,
+        "route_sections": [
+            {"ordered_line_routes": [sequence]} for sequence in sequences
+        ],
+    }
+
+
+@pytest.fixture()
+def analysis() -> RouteAnalysis:
+    return RouteAnalysis(
+        [
+            line_stub("1", ["a", "b", "c", "d"], ["d", "c", "b", "a"]),
+            line_stub("2", ["b", "c", "d", "e"]),
+            line_stub("3", ["x", "y"]),
+        ],
+    )
+
+
+def test_shared_stops(analysis: RouteAnalysis) -> None:
+    shared = analysis.shared_stops()
+
+    assert shared.loc["1", "1"] == 4
+    assert shared.loc["1", "2"] == shared.loc["2", "1"] == 3
+    assert shared.loc["1", "3"] == 0
+
+
+def test_shared_segments(analysis: RouteAnalysis) -> None:
+    shared = analysis.shared_segments()
+
+    # Both directions of line 1 are distinct segments
+    assert shared.loc["1", "1"] == 6
+    assert shared.loc["1", "2"] == 2
+    assert shared.loc["2", "3"] == 0
+
+
+def test_similarity(analysis: RouteAnalysis) -> None:
+    stops = analysis.similarity()
+    segments = analysis.similarity(by="segments")
+
+    assert stops.loc["1", "2"] == pytest.approx(3 / 5)
+    assert segments.loc["1", "2"] == pytest.approx(2 / 7)
+    assert stops.loc["3", "3"] == 1
+
+    with pytest.raises(ValueError, match="Unknown similarity basis"):
+        analysis.similarity(by="lines")
+
+
+def test_corridor_frequency(analysis: RouteAnalysis) -> None:
+    corridors = analysis.corridor_frequency()
+
+    assert corridors.iloc[0] == 2
+    assert corridors[("b", "c")] == 2
+    assert corridors[("x", "y")] == 1
+    assert corridors[("d", "c")] == 1
@@ -0,0 +1,56 @@
+"""ChangeLog tests."""
+
+from datetime import datetime, timedelta, timezone
+
+from tflump import ChangeLog
+
+
+def test_change_log() -> None:
+    """Record states are recovered at every snapshot from the deltas alone."""
+    t0 = datetime(2024, 7, 1, tzinfo=timezone.utc)
+    t1, t2 = t0 + timedelta(days=7), t0 + timedelta(days=14)
+    a1, a2, b1 = {"v": "a1"}, {"v": "a2"}, {"v": "b1"}
+
+    changes = ChangeLog()
+    assert changes.record(t0, {}, {"a": a1})
+    assert changes.record(t1, {"a": a1}, {"a": a2, "b": b1})
+    assert not changes.record(t2, {"a": a2, "b": b1}, {"a": {"v": "a2"}, "b": b1})
+
+    current = {"b": b1}
+    assert changes.record(t2, {"a": a2, "b": b1}, current)
+
+    # Only prior states are kept
+    assert changes.deltas == [{"a": None}, {"a": a1, "b": None}, {"a": a2}]
+
+    assert changes.state("a", changes.snapshot(t0), current) == a1
+    assert changes.state("a", changes.snapshot(t1 + timedelta(hours=1)), current) == a2
+    assert changes.state("a", changes.snapshot(), current) is None
+
+    diff = changes.diff(current, since=t0, until=t1)
+    assert diff["change"].to_dict() == {"a": "modified", "b": "added"}
+
+    diff = changes.diff(current, since=t0)
+    assert diff["change"].to_dict() == {"a": "removed", "b": "added"}
+    assert diff.loc["a", "before"] == a1
+
+    # Persisted logs rebuild their index
+    assert ChangeLog.from_dict(changes.to_dict()).index == changes.index
+
+
+def test_change_log_naive_timestamps() -> None:
+    """Naive timestamps select snapshots as UTC."""
+    t0 = datetime(2026, 10, 4, tzinfo=timezone.utc)
+    t1 = t0 + timedelta(days=7)
+
+    changes = ChangeLog()
+    changes.record(t0, {}, {"a": {"v": "a1"}})
+    changes.record(t1, {"a": {"v": "a1"}}, {"a": {"v": "a2"}})
+
+    assert changes.snapshot(datetime(2026, 10, 11)) == 1
+    assert changes.snapshot(datetime(2026, 10, 10, 23)) == 0
+
+    diff = changes.diff({"a": {"v": "a2"}}, since=datetime(2026, 10, 11))
+    assert diff.empty
+
+    diff = changes.diff({"a": {"v": "a2"}}, since=datetime(2026, 10, 10))
+    assert diff["change"].to_dict() == {"a": "modified"}
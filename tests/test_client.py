@@ -1,3 +1,72 @@
+"""Client tests."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from tflump import (
+    get_settings,
+    get_shared_async_tfl_client,
+    get_shared_tfl_client,
+    get_tfl_client,
+    shared_async_tfl_client,
+)
+from tflump.client import RateLimit
+
+
+def test_client_settings(monkeypatch) -> None:
+    """Client construction follows `TflSettings.client`."""
+    options = get_settings().tfl.client
+    monkeypatch.setattr(options, "read_timeout", 30.0)
+    monkeypatch.setattr(options, "compression", False)
+
+    with get_tfl_client() as client:
+        assert client.timeout.read == 30.0
+        assert client.timeout.connect == options.connect_timeout
+        assert client.headers["accept-encoding"] == "identity"
+
+
+def test_shared_client() -> None:
+    """Shared clients are reused per process and per `shared_async_tfl_client`."""
+    assert get_shared_tfl_client() is get_shared_tfl_client()
+
+    async def shared() -> httpx.AsyncClient:
+        async with shared_async_tfl_client() as client:
+            async with shared_async_tfl_client() as nested:
+                assert nested is client
+
+            assert get_shared_async_tfl_client() is client
+
+        return client
+
+    client = asyncio.run(shared())
+
+    assert client.is_closed
+    assert asyncio.run(shared()) is not client
+
+    with pytest.raises(RuntimeError, match="No shared async client"):
+        get_shared_async_tfl_client()
+
+
+def test_rate_limit_threads() -> None:
+    """RateLimit admits requests from threads sharing one client."""
+    transport = RateLimit(
+        httpx.MockTransport(lambda request: httpx.Response(200)),
+        max_requests=100,
+        request_period=1,
+    )
+
+    with (
+        httpx.Client(transport=transport, base_url="https://api.tfl.gov.uk") as client,
+        ThreadPoolExecutor(max_workers=8) as pool,
+    ):
+        responses = list(pool.map(lambda _: client.get("/Line/Mode/bus"), range(16)))
+
+    assert [response.status_code for response in responses] == [200] * 16
+
+
 # """Client tests (rough)."""
 
 # from datetime import datetime, timezone
@@ -1,15 +1,34 @@
 """Store tests (rough)."""
 
+import asyncio
+import importlib.resources
+import pickle
+from collections.abc import Callable
 from pathlib import Path
 
+import httpx
 import pytest
 
 from tflump import (
+    AsyncLineStore,
+    BlobTable,
+    ChangeLog,
     LineStore,
     StopPoint,
     StopPointStore,
     get_tfl_client,
 )
+from tflump.client import AsyncRateLimit
+from tflump.stores import BaseLineStore
+
+
+@pytest.fixture(autouse=True)
+def datadir_fix(tmp_path, monkeypatch):
+    """Keep the files of every store constructed by a test under `tmp_path`."""
+    (tmp_path / "data").mkdir()
+    monkeypatch.setattr(importlib.resources, "files", lambda _: tmp_path)
+
+    return tmp_path
 
 
 @pytest.mark.skip(reason="Messy overwrite issues.")
@@ -50,3 +69,633 @@ def test_line_store(testpath_fix) -> None:
 
         # File should be added
         assert Path(testpath_fix).exists()
+
+
+## LineStore blobs
+@pytest.fixture()
+def line_store_fix(monkeypatch):
+    line_store = LineStore(mode="bus")
+    monkeypatch.setattr(line_store, "data", {})
+    monkeypatch.setattr(line_store, "blobs", BlobTable())
+    monkeypatch.setattr(line_store, "loaded_service_types", {})
+    monkeypatch.setattr(line_store, "unresolved", set())
+    monkeypatch.setattr(line_store, "_fetch", lambda: None)
+
+    return line_store
+
+
+def route_section_stub(direction: str, stops: list[str]) -> dict:
+    return {
+        "name": direction,
+        "direction": direction,
+        "line_strings": ["[[[-0.1,51.5],[-0.2,51.6]]]"],
+        "ordered_line_routes": [stops],
+    }
+
+
+def test_line_store_blobs(line_store_fix) -> None:
+    """Shared route fields are stored once and expanded on read."""
+    line = {
+        "id": "1",
+        "name": "1",
+        "route_sections": [
+            route_section_stub("inbound", ["a", "b", "c"]),
+            route_section_stub("outbound", ["c", "b", "a"]),
+        ],
+    }
+    line_store_fix.data["1"] = line_store_fix._compact(line)
+
+    # Both sections share one line string, each has its own stop sequence
+    assert len(line_store_fix.blobs) == 3
+    assert line_store_fix.get_line("1") == line
+    assert line_store_fix.get_lines(["1", "2"]) == [line, None]
+    assert line_store_fix.dataframe().loc[0, "route_sections"] == line["route_sections"]
+
+    line_store_fix.save()
+    line_store_fix.data = {}
+    line_store_fix.blobs = BlobTable()
+    line_store_fix.load()
+
+    assert line_store_fix.get_line("1") == line
+    assert len(line_store_fix.blobs) == 3
+
+
+def test_line_store_legacy_file(line_store_fix) -> None:
+    """Files saved without blobs are compacted on load."""
+    line = {"id": "1", "name": "1", "route_sections": [route_section_stub("inbound", ["a"])]}
+
+    with (line_store_fix.datadir / "data/lines-bus.pkl").open("wb") as datafile:
+        pickle.dump({"1": line}, datafile)
+
+    line_store_fix.load()
+
+    assert line_store_fix.get_line("1") == line
+    assert len(line_store_fix.blobs) == 2
+
+
+## AsyncLineStore
+def stop_point_payload(naptan_id: str, line_id: str) -> dict:
+    return {
+        "id": naptan_id,
+        "name": naptan_id,
+        "lat": 51.5,
+        "lon": -0.1,
+        "lines": [{"id": line_id}],
+        "modes": ["bus"],
+    }
+
+
+def route_section_payload(line_id: str, direction: str, service_type: str) -> dict:
+    return {
+        "name": line_id,
+        "direction": direction,
+        "originationName": "Origin",
+        "destinationName": "Destination",
+        "originator": "a",
+        "destination": "c",
+        "serviceType": service_type,
+        "validFrom": "2024-07-01T00:00:00Z",
+        "validTo": "2025-07-01T00:00:00Z",
+    }
+
+
+def line_payload(line_id: str, service_type: str = "Regular") -> dict:
+    return {
+        "id": line_id,
+        "name": line_id.upper(),
+        "modeName": "bus",
+        "routeSections": [
+            route_section_payload(line_id, direction, service_type)
+            for direction in ("inbound", "outbound")
+        ],
+        "serviceTypes": [{"name": service_type, "uri": f"/Line/{line_id}"}],
+    }
+
+
+def sequence_payload(line_id: str, direction: str, service_type: str) -> dict:
+    naptan_ids = [f"{line_id}-a", f"{line_id}-b", "shared"]
+    if service_type == "Night":
+        naptan_ids[1] = f"{line_id}-night"
+    if direction == "inbound":
+        naptan_ids.reverse()
+
+    return {
+        "isOutboundOnly": False,
+        "lineStrings": ["[[[-0.1,51.5],[-0.2,51.6]]]"],
+        "orderedLineRoutes": [{"naptanIds": naptan_ids}],
+        "stopPointSequences": [
+            {
+                "stopPoint": [
+                    stop_point_payload(naptan_id, line_id) for naptan_id in naptan_ids
+                ],
+            },
+        ],
+    }
+
+
+def tfl_handler(lines: list[dict], requested: list[str]) -> Callable:
+    """Return a MockTransport handler serving stub TfL Line responses."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path)
+        parts = request.url.path.split("/")
+
+        if parts[2] == "Mode":
+            return httpx.Response(200, json=lines)
+
+        if parts[3:] == ["Route"]:
+            line_ids = parts[2].split(",")
+            return httpx.Response(
+                200,
+                json=[line for line in lines if line["id"] in line_ids],
+            )
+
+        if parts[3:5] == ["Route", "Sequence"]:
+            # TfL returns the Regular sequence unless asked for another
+            service_type = request.url.params.get("serviceTypes", "Regular")
+            return httpx.Response(
+                200,
+                json=sequence_payload(parts[2], parts[5], service_type),
+            )
+
+        return httpx.Response(404)
+
+    return handler
+
+
+@pytest.fixture()
+def async_line_store_fix(monkeypatch):
+    line_store = AsyncLineStore(mode="bus")
+    stoppoint_store = line_store.stoppoint_store()
+    for store in (line_store, stoppoint_store):
+        monkeypatch.setattr(store, "data", {})
+        monkeypatch.setattr(store, "unresolved", set())
+        monkeypatch.setattr(store, "changes", ChangeLog())
+        monkeypatch.setattr(store, "_baseline", {})
+    monkeypatch.setattr(line_store, "blobs", BlobTable())
+    monkeypatch.setattr(line_store, "loaded_service_types", {})
+
+    return line_store
+
+
+@pytest.fixture()
+def tfl_lines_fix():
+    return []
+
+
+@pytest.fixture()
+def requested_fix(async_line_store_fix, tfl_lines_fix, monkeypatch):
+    """Serve `tfl_lines_fix` to the async line store, yielding the requested paths."""
+    requested = []
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(tfl_handler(tfl_lines_fix, requested)),
+        base_url="https://api.tfl.gov.uk",
+    )
+    monkeypatch.setattr(async_line_store_fix, "client", client)
+
+    yield requested
+
+    asyncio.run(client.aclose())
+
+
+def test_async_line_store(async_line_store_fix, tfl_lines_fix, requested_fix) -> None:
+    """AsyncLineStore loads lines and stop points without blocking."""
+    tfl_lines_fix.extend([line_payload("1"), line_payload("n1", "Night")])
+
+    asyncio.run(async_line_store_fix.load())
+
+    assert len(requested_fix) == 5
+    assert set(async_line_store_fix.data) == {"1", "n1"}
+    assert async_line_store_fix.get_line("1")["route_sections"][0][
+        "ordered_line_routes"
+    ] == [["shared", "1-b", "1-a"]]
+    assert async_line_store_fix.stoppoint_store().has_stop_point("shared")
+
+    # Both stores are saved
+    assert (async_line_store_fix.datadir / "data/lines-bus.pkl").is_file()
+    assert (async_line_store_fix.datadir / "data/stoppoints.pkl").is_file()
+
+    # Lines already in the store are not fetched again
+    requested_fix.clear()
+    asyncio.run(async_line_store_fix.load())
+
+    assert requested_fix == ["/Line/Mode/bus/Route"]
+
+
+def test_async_line_store_request_error(async_line_store_fix, monkeypatch) -> None:
+    """A failed sequence request raises its httpx error, as LineStore does."""
+    requested = []
+    handler = tfl_handler([line_payload("1"), line_payload("missing")], requested)
+
+    def missing_handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.startswith("/Line/missing/Route/Sequence"):
+            return httpx.Response(404)
+        return handler(request)
+
+    async def load() -> None:
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(missing_handler),
+            base_url="https://api.tfl.gov.uk",
+        ) as client:
+            monkeypatch.setattr(async_line_store_fix, "client", client)
+            await async_line_store_fix.load()
+
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        asyncio.run(load())
+
+    assert exc_info.value.response.status_code == 404
+    assert not async_line_store_fix.has_line("missing")
+
+
+def test_async_rate_limit() -> None:
+    """AsyncRateLimit admits concurrent requests through the wrapped transport."""
+    requested = []
+    transport = AsyncRateLimit(
+        httpx.MockTransport(tfl_handler([], requested)),
+        max_requests=100,
+        request_period=1,
+    )
+
+    async def fetch() -> list[httpx.Response]:
+        async with httpx.AsyncClient(
+            transport=transport,
+            base_url="https://api.tfl.gov.uk",
+        ) as client:
+            return await asyncio.gather(
+                *(client.get("/Line/Mode/bus/Route") for _ in range(5)),
+            )
+
+    responses = asyncio.run(fetch())
+
+    assert [response.status_code for response in responses] == [200] * 5
+    assert len(requested) == 5
+
+
+def test_async_line_store_selection(
+    async_line_store_fix,
+    tfl_lines_fix,
+    requested_fix,
+) -> None:
+    """Narrowed loads fetch only the selected lines and route sections."""
+    tfl_lines_fix.extend(
+        [
+            line_payload("1"),
+            line_payload("2"),
+            line_payload("sl1"),
+            line_payload("n1", "Night"),
+        ],
+    )
+
+    # Line ids are batched into a multi-id lookup
+    asyncio.run(async_line_store_fix.load(line_ids=["1", "n1", "1"]))
+
+    assert requested_fix[0] == "/Line/1,n1/Route"
+    assert set(async_line_store_fix.data) == {"1", "n1"}
+
+    # Name prefix
+    asyncio.run(async_line_store_fix.load(match="sl"))
+
+    assert set(async_line_store_fix.data) == {"1", "n1", "sl1"}
+    assert not async_line_store_fix.stoppoint_store().has_stop_point("2-a")
+
+    # Service type, only Night sequences are requested
+    requested_fix.clear()
+    async_line_store_fix.data.clear()
+    (async_line_store_fix.datadir / "data/lines-bus.pkl").unlink()
+    asyncio.run(async_line_store_fix.load(service_types=["Night"]))
+
+    assert set(async_line_store_fix.data) == {"n1"}
+    assert len(requested_fix) == 3
+
+
+def test_async_line_store_service_types(
+    async_line_store_fix,
+    tfl_lines_fix,
+    requested_fix,
+) -> None:
+    """Lines loaded for fewer service types are refetched by wider loads."""
+    line = line_payload("24")
+    line["routeSections"] += line_payload("24", "Night")["routeSections"]
+    line["serviceTypes"] += line_payload("24", "Night")["serviceTypes"]
+    tfl_lines_fix.append(line)
+
+    def service_types() -> list[str]:
+        return sorted(
+            section["service_type"]
+            for section in async_line_store_fix.get_line("24")["route_sections"]
+        )
+
+    asyncio.run(async_line_store_fix.load(service_types=["Night"]))
+
+    assert service_types() == ["Night", "Night"]
+
+    # A full load fetches the line again
+    requested_fix.clear()
+    asyncio.run(async_line_store_fix.load())
+
+    assert len(requested_fix) == 5
+    assert service_types() == ["Night", "Night", "Regular", "Regular"]
+
+    # Each section has the sequence of its own service type
+    for section in async_line_store_fix.get_line("24")["route_sections"]:
+        night = "24-night" in section["ordered_line_routes"][0]
+        assert night == (section["service_type"] == "Night")
+
+    # Narrowed refreshes keep the sections of other service types
+    first = async_line_store_fix.changes.crawls[-1]
+    line["routeSections"][2]["validTo"] = "2026-07-01T00:00:00Z"
+    asyncio.run(async_line_store_fix.load(refresh=True, service_types=["Night"]))
+
+    assert service_types() == ["Night", "Night", "Regular", "Regular"]
+    assert async_line_store_fix.route_diff(since=first)["change"].to_dict() == {
+        ("24", "inbound", "Night", "a", "c"): "modified",
+    }
+
+    # Loaded service types survive a reload
+    requested_fix.clear()
+    asyncio.run(async_line_store_fix.load())
+
+    assert requested_fix == ["/Line/Mode/bus/Route"]
+
+
+def test_lines_endpoints(async_line_store_fix) -> None:
+    """Line ids are split into batches of multi-id lookups."""
+    line_ids = [str(i) for i in range(45)]
+
+    endpoints = async_line_store_fix._lines_endpoints(line_ids, ["Night"])
+
+    assert len(endpoints) == 3
+    assert endpoints[0] == f"/Line/{','.join(line_ids[:20])}/Route?serviceTypes=Night"
+    assert async_line_store_fix._lines_endpoints() == [
+        "/Line/Mode/bus/Route?serviceTypes=Regular,Night",
+    ]
+
+
+## Schema migrations
+@pytest.fixture()
+def stoppoint_store_fix(monkeypatch):
+    stoppoint_store = StopPointStore(storename="data/_test-migrations")
+    monkeypatch.setattr(stoppoint_store, "data", {})
+    monkeypatch.setattr(stoppoint_store, "unresolved", set())
+
+    return stoppoint_store
+
+
+def read_store_file(store: StopPointStore) -> dict:
+    with (store.datadir / (store.storename + ".pkl")).open("rb") as datafile:
+        return pickle.load(datafile)
+
+
+def test_store_schema(stoppoint_store_fix) -> None:
+    """Unversioned files are upgraded and saved with a schema and fingerprint."""
+    stoppoint = stop_point_payload("a", "1") | {"lines": ["1"]}
+    with (stoppoint_store_fix.datadir / "data/_test-migrations.pkl").open("wb") as f:
+        pickle.dump({"a": stoppoint}, f)
+
+    stoppoint_store_fix.load()
+
+    assert stoppoint_store_fix.get_stop_point("a") == stoppoint
+    assert read_store_file(stoppoint_store_fix) == {
+        "schema": StopPointStore.schema_version,
+        "fingerprint": StopPointStore.fingerprint(),
+        "payload": {"a": stoppoint},
+        "changes": {"crawls": [], "deltas": []},
+        "unresolved": [],
+    }
+
+
+def test_store_migration(stoppoint_store_fix, monkeypatch) -> None:
+    """Registered migrations upgrade records, underivable records are dropped."""
+    stoppoint_store_fix.data = {
+        "a": stop_point_payload("a", "1") | {"lines": ["1"]},
+        "b": stop_point_payload("b", "1") | {"lines": []},
+    }
+    stoppoint_store_fix.save()
+
+    def split_lines(store: StopPointStore) -> set[str]:
+        for stoppoint in store.data.values():
+            stoppoint["line_count"] = len(stoppoint["lines"])
+        return {key for key, stoppoint in store.data.items() if not stoppoint["lines"]}
+
+    monkeypatch.setattr(StopPointStore, "schema_version", 2)
+    monkeypatch.setitem(StopPointStore.migrations, 1, split_lines)
+
+    stoppoint_store_fix.data = {}
+    stoppoint_store_fix.load()
+
+    assert stoppoint_store_fix.get_stop_point("a")["line_count"] == 1
+    assert not stoppoint_store_fix.has_stop_point("b")
+    assert stoppoint_store_fix.unresolved == {"b"}
+    assert read_store_file(stoppoint_store_fix)["schema"] == 2
+
+    # Dropped records stay unresolved across loads until re-added
+    stoppoint_store_fix.unresolved = set()
+    stoppoint_store_fix.load()
+
+    assert stoppoint_store_fix.unresolved == {"b"}
+
+    stoppoint_store_fix.add_stop_points([stop_point_payload("b", "1")])
+
+    assert not stoppoint_store_fix.unresolved
+    assert read_store_file(stoppoint_store_fix)["unresolved"] == []
+
+    # Newer files are not overwritten
+    monkeypatch.setattr(StopPointStore, "schema_version", 1)
+
+    with pytest.raises(ValueError, match="newer than the supported schema"):
+        stoppoint_store_fix.load()
+
+
+@pytest.mark.filterwarnings("error")
+def test_line_store_migration(
+    line_store_fix,
+    async_line_store_fix,
+    monkeypatch,
+) -> None:
+    """Line migrations apply to files loaded through either line store."""
+    line = {"id": "1", "name": "1", "route_sections": [route_section_stub("inbound", ["a"])]}
+    line_store_fix.data["1"] = line_store_fix._compact(line)
+    line_store_fix.save()
+
+    monkeypatch.setattr(BaseLineStore, "schema_version", 2)
+    monkeypatch.setattr(BaseLineStore, "migrations", {})
+
+    @LineStore.migration(1)
+    def add_route_field(store: BaseLineStore) -> set[str]:
+        for record in store.data.values():
+            for section in record["route_sections"]:
+                section.setdefault("new_field", None)
+        return set()
+
+    assert BaseLineStore.migrations == {1: add_route_field}
+
+    for store in (line_store_fix, async_line_store_fix):
+        store._read()
+
+        assert store.get_line("1")["route_sections"][0]["new_field"] is None
+        assert not store.unresolved
+
+
+def test_line_store_migration_blobs(line_store_fix, monkeypatch) -> None:
+    """Line migrations rewrite shared route fields by value, not by blob key."""
+    line = {
+        "id": "1",
+        "name": "1",
+        "route_sections": [
+            route_section_stub("inbound", ["a", "b"]),
+            route_section_stub("outbound", ["b", "a"]),
+        ],
+    }
+    line_store_fix.data["1"] = line_store_fix._compact(line)
+    line_store_fix.save()
+
+    def prefix_stop_ids(store: BaseLineStore) -> set[str]:
+        for record in store.data.values():
+            for section in record["route_sections"]:
+                section["ordered_line_routes"] = [
+                    [f"490{stop_id}" for stop_id in route]
+                    for route in section["ordered_line_routes"]
+                ]
+        return set()
+
+    monkeypatch.setattr(BaseLineStore, "schema_version", 2)
+    monkeypatch.setattr(BaseLineStore, "migrations", {1: prefix_stop_ids})
+
+    line_store_fix.load()
+
+    routes = [
+        section["ordered_line_routes"]
+        for section in line_store_fix.get_line("1")["route_sections"]
+    ]
+    assert routes == [[["490a", "490b"]], [["490b", "490a"]]]
+    assert all(
+        BlobTable.key(value) == key for key, value in line_store_fix.blobs.data.items()
+    )
+    assert len(line_store_fix.blobs) == 3
+
+
+def test_line_store_unresolved_stops(
+    async_line_store_fix,
+    tfl_lines_fix,
+    requested_fix,
+) -> None:
+    """Lines serving StopPoints dropped by a migration are refetched."""
+    tfl_lines_fix.extend([line_payload("1"), line_payload("2")])
+    stoppoint_store = async_line_store_fix.stoppoint_store()
+
+    asyncio.run(async_line_store_fix.load())
+
+    requested_fix.clear()
+    del stoppoint_store.data["1-a"]
+    stoppoint_store.unresolved.add("1-a")
+    asyncio.run(stoppoint_store.save())
+    asyncio.run(async_line_store_fix.load())
+
+    assert requested_fix == [
+        "/Line/Mode/bus/Route",
+        "/Line/1/Route/Sequence/inbound",
+        "/Line/1/Route/Sequence/outbound",
+    ]
+    assert not stoppoint_store.unresolved
+
+    # Narrowed loads still refetch the lines held in `unresolved`
+    requested_fix.clear()
+    del stoppoint_store.data["1-a"]
+    stoppoint_store.unresolved.add("1-a")
+    asyncio.run(stoppoint_store.save())
+    asyncio.run(async_line_store_fix.load(line_ids=["2"], refresh=True))
+
+    assert requested_fix == [
+        "/Line/2,1/Route",
+        "/Line/1/Route/Sequence/inbound",
+        "/Line/1/Route/Sequence/outbound",
+        "/Line/2/Route/Sequence/inbound",
+        "/Line/2/Route/Sequence/outbound",
+    ]
+    assert not async_line_store_fix.unresolved
+    assert not stoppoint_store.unresolved
+
+
+## Snapshots
+def test_line_store_refresh(
+    async_line_store_fix,
+    tfl_lines_fix,
+    requested_fix,
+    monkeypatch,
+) -> None:
+    """Refreshes record the changed lines, routes and stops of each crawl."""
+    tfl_lines_fix.extend([line_payload("1"), line_payload("2")])
+    stoppoint_store = async_line_store_fix.stoppoint_store()
+    monkeypatch.setattr(stoppoint_store, "changes", ChangeLog())
+
+    asyncio.run(async_line_store_fix.load())
+    first = async_line_store_fix.changes.crawls[-1]
+
+    # Line 2 withdrawn, line 3 added and the outbound route of line 1 extended
+    tfl_lines_fix[1] = line_payload("3")
+    tfl_lines_fix[0]["routeSections"][1]["validTo"] = "2026-07-01T00:00:00Z"
+    asyncio.run(async_line_store_fix.load(refresh=True))
+
+    changes = async_line_store_fix.diff(since=first)
+
+    assert changes["change"].to_dict() == {
+        "1": "modified",
+        "2": "removed",
+        "3": "added",
+    }
+    assert changes.loc["2", "before"]["id"] == "2"
+    assert changes.loc["1", "after"] == async_line_store_fix.get_line("1")
+
+    routes = async_line_store_fix.route_diff(since=first)
+
+    assert routes["change"].to_dict() == {
+        ("1", "outbound", "Regular", "a", "c"): "modified",
+    } | {
+        ("2", direction, "Regular", "a", "c"): "removed"
+        for direction in ("inbound", "outbound")
+    } | {
+        ("3", direction, "Regular", "a", "c"): "added"
+        for direction in ("inbound", "outbound")
+    }
+
+    # StopPoints share the crawl timestamps of the line store
+    assert stoppoint_store.changes.crawls == async_line_store_fix.changes.crawls
+    # The stub "shared" stop lists only the line that last fetched it
+    assert set(stoppoint_store.diff(since=first).index) == {"3-a", "3-b", "shared"}
+
+    # Nothing changed before the first crawl completed
+    assert async_line_store_fix.diff(since=first, until=first).empty
+
+    # History survives a reload
+    asyncio.run(async_line_store_fix.load())
+
+    assert len(async_line_store_fix.changes) == 2
+    assert async_line_store_fix.diff(since=first).loc["1", "after"] == (
+        async_line_store_fix.get_line("1")
+    )
+
+
+@pytest.mark.usefixtures("requested_fix")
+def test_unresolved_snapshots(
+    async_line_store_fix,
+    tfl_lines_fix,
+    monkeypatch,
+) -> None:
+    """Records dropped by a migration are not logged as removed."""
+    tfl_lines_fix.extend([line_payload("1")])
+    stoppoint_store = async_line_store_fix.stoppoint_store()
+
+    asyncio.run(async_line_store_fix.load())
+    first = async_line_store_fix.changes.crawls[-1]
+
+    stoppoint_store.data["other"] = stop_point_payload("other", "2")
+    asyncio.run(stoppoint_store.save())
+
+    # "1-a" is refetched with line 1, no line serves "other"
+    monkeypatch.setattr(StopPointStore, "schema_version", 2)
+    monkeypatch.setattr(StopPointStore, "migrations", {1: lambda _: {"1-a", "other"}})
+    asyncio.run(async_line_store_fix.load())
+
+    assert stoppoint_store.unresolved == {"other"}
+    assert stoppoint_store.diff(since=first).empty
+    assert async_line_store_fix.diff(since=first).empty